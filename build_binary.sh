@@ -2,9 +2,22 @@
 
 # build_binary.sh
 # Builds SnapTask into a single self-contained binary using PyInstaller + uv
+#
+# Usage:
+#   ./build_binary.sh            # Single-file binary: dist/snaptask
+#   ./build_binary.sh --onedir   # Directory build (faster startup): dist/onedir/snaptask/snaptask
+#   ./build_binary.sh --compare  # Build both and record startup timings for each
 
 set -e  # Exit on error
 
+VARIANT="onefile"
+case "$1" in
+    --onedir) VARIANT="onedir" ;;
+    --compare) VARIANT="compare" ;;
+    "") ;;
+    *) echo "Usage: $0 [--onedir|--compare]"; exit 1 ;;
+esac
+
 # Colors for output
 GREEN='\033[0;32m'
 BLUE='\033[0;34m'
@@ -54,29 +67,86 @@ if [ -d "build" ] || [ -d "dist" ]; then
     echo ""
 fi
 
+# Cold-start timings live outside dist/ so the clean step above doesn't
+# delete the other variant's numbers
+TIMINGS_DIR="build-timings"
+
+# Record cold-start timings for a built binary in $TIMINGS_DIR/startup-<variant>.txt
+measure_startup() {
+    local bin="$1"
+    local variant="$2"
+    local out="$TIMINGS_DIR/startup-$variant.txt"
+
+    mkdir -p "$TIMINGS_DIR"
+
+    echo -e "${BLUE}Measuring $variant startup...${NC}"
+    {
+        echo "SnapTask startup timings ($variant build, $(date '+%Y-%m-%d %H:%M'))"
+        echo ""
+        echo "Wall-clock 'snaptask --version' (run 1 is cold):"
+        TIMEFORMAT='%R s'
+        for i in 1 2 3 4 5; do
+            echo "  run $i: $( { time "$bin" --version > /dev/null 2>&1; } 2>&1 )"
+        done
+        "$bin" --profile-startup 2>&1 || true
+    } > "$out"
+    echo -e "${GREEN}✓ Saved to $out${NC}"
+}
+
 # Build the binary using uv run
 echo -e "${BLUE}Building binary (this may take 1-2 minutes)...${NC}"
-uv run pyinstaller snaptask.spec
+if [[ "$VARIANT" == "onefile" || "$VARIANT" == "compare" ]]; then
+    uv run pyinstaller snaptask.spec
+fi
+if [[ "$VARIANT" == "onedir" || "$VARIANT" == "compare" ]]; then
+    uv run pyinstaller --distpath dist/onedir snaptask_onedir.spec
+fi
 
 echo ""
 
+if [[ "$VARIANT" == "compare" ]]; then
+    if [ ! -f "dist/snaptask" ] || [ ! -f "dist/onedir/snaptask/snaptask" ]; then
+        echo -e "${RED}✗ Build failed${NC}"
+        exit 1
+    fi
+    measure_startup dist/snaptask onefile
+    measure_startup dist/onedir/snaptask/snaptask onedir
+    echo ""
+    for variant in onefile onedir; do
+        echo -e "${YELLOW}$variant:${NC}"
+        grep "run " "$TIMINGS_DIR/startup-$variant.txt"
+    done
+    echo ""
+    echo -e "Full profiles: ${BLUE}$TIMINGS_DIR/startup-onefile.txt${NC}, ${BLUE}$TIMINGS_DIR/startup-onedir.txt${NC}"
+    exit 0
+fi
+
+if [[ "$VARIANT" == "onedir" ]]; then
+    BINARY="dist/onedir/snaptask/snaptask"
+    BUNDLE="dist/onedir/snaptask"
+else
+    BINARY="dist/snaptask"
+    BUNDLE="dist/snaptask"
+fi
+
 # Check if build succeeded
-if [ -f "dist/snaptask" ]; then
+if [ -f "$BINARY" ]; then
     echo -e "${GREEN}========================================${NC}"
     echo -e "${GREEN}✓ Binary created successfully!${NC}"
     echo -e "${GREEN}========================================${NC}"
     echo ""
-    echo -e "Location: ${BLUE}dist/snaptask${NC}"
-    echo -e "Size: ${BLUE}$(du -h dist/snaptask | cut -f1)${NC}"
+    echo -e "Location: ${BLUE}$BINARY${NC}"
+    echo -e "Size: ${BLUE}$(du -sh "$BUNDLE" | cut -f1)${NC}"
     echo ""
 
     # Test the binary
     echo -e "${BLUE}Testing binary...${NC}"
-    if dist/snaptask --help > /dev/null 2>&1; then
+    if "$BINARY" --help > /dev/null 2>&1; then
         echo -e "${GREEN}✓ Binary runs successfully${NC}"
     else
         echo -e "${YELLOW}⚠ Warning: Binary may have issues (but this could be due to missing API key)${NC}"
     fi
+    measure_startup "$BINARY" "$VARIANT"
     echo ""
 
     # Offer to install
@@ -88,13 +158,26 @@ if [ -f "dist/snaptask" ]; then
     read -p "Choose option (1/2/3): " -n 1 -r
     echo ""
 
-    if [[ $REPLY == "1" ]]; then
+    if [[ $REPLY == "1" && "$VARIANT" == "onedir" ]]; then
+        echo -e "${BLUE}Installing to /usr/local/lib/snaptask...${NC}"
+        sudo rm -rf /usr/local/lib/snaptask
+        sudo cp -R "$BUNDLE" /usr/local/lib/snaptask
+        sudo ln -sf /usr/local/lib/snaptask/snaptask /usr/local/bin/snaptask
+        echo -e "${GREEN}✓ Installed to /usr/local/lib/snaptask (linked from /usr/local/bin/snaptask)${NC}"
+        echo ""
+        echo -e "${GREEN}You can now run 'snaptask' from anywhere!${NC}"
+    elif [[ $REPLY == "1" ]]; then
         echo -e "${BLUE}Installing to /usr/local/bin...${NC}"
         sudo cp dist/snaptask /usr/local/bin/snaptask
         sudo chmod +x /usr/local/bin/snaptask
         echo -e "${GREEN}✓ Installed to /usr/local/bin/snaptask${NC}"
         echo ""
         echo -e "${GREEN}You can now run 'snaptask' from anywhere!${NC}"
+    elif [[ $REPLY == "2" && "$VARIANT" == "onedir" ]]; then
+        echo ""
+        echo -e "${BLUE}To install manually later, run:${NC}"
+        echo "  sudo cp -R $BUNDLE /usr/local/lib/snaptask"
+        echo "  sudo ln -sf /usr/local/lib/snaptask/snaptask /usr/local/bin/snaptask"
     elif [[ $REPLY == "2" ]]; then
         echo ""
         echo -e "${BLUE}To install manually later, run:${NC}"
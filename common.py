@@ -3,11 +3,21 @@
 Common utilities for SnapTask - shared between OCR and Vision modes
 """
 
-import subprocess
 import os
 import json
+import threading
 from datetime import datetime
-from dotenv import load_dotenv
+
+# Capture-path helpers live in snaptask_capture so screencapture can launch
+# before anything heavier is imported; re-exported here for existing callers
+from snaptask_capture import (
+    ENV_FILE,
+    SNAP_DIR,
+    capture_screenshot,
+    generate_screenshot_path,
+    get_provider,
+    show_notification,
+)
 
 
 # Default prompts
@@ -45,17 +55,24 @@ DEFAULT_VISION_PROMPT = """Analyze this screenshot. Your tasks:
 Be concise but insightful. Use the read_file tool first to check existing content, then use write_file to update."""
 
 
-def capture_screenshot(output_path):
-    """Capture screenshot using macOS screencapture command"""
-    try:
-        # -i: interactive selection (drag to select area, spacebar for window)
-        # -x: no sound, -t png: format
-        subprocess.run(['screencapture', '-i', '-x', '-t', 'png', output_path], check=True)
-        print(f"Screenshot saved to: {output_path}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error capturing screenshot: {e}")
-        return False
+# Instructions appended to the conversation when the model can't call tools
+FALLBACK_INSTRUCTIONS = """Tools are not available, so reply in plain text instead.
+
+Current todo.md:
+{todos}
+
+Current focused.md:
+{focus}
+
+After your analysis, list each NEW action item (not already in todo.md) on its own line as:
+TODO: <task description>
+Then end with one line describing the current focus:
+FOCUS: <current focus>"""
+
+# Default models and endpoints
+DEFAULT_OCR_MODEL = "gpt-4o-mini"
+DEFAULT_VISION_MODEL = "gpt-4o"
+DEFAULT_LOCAL_BASE_URL = "http://localhost:8080/v1"
 
 
 def load_prompt(prompt_name, default_prompt):
@@ -118,6 +135,20 @@ def get_tool_definitions():
     ]
 
 
+def resolve_snap_path(snap_dir, relative_path):
+    """
+    Resolve a tool-supplied path inside snap_dir
+
+    Returns:
+        Absolute path, or None if it would escape snap_dir (e.g. '../other/todo.md')
+    """
+    base = os.path.realpath(snap_dir)
+    path = os.path.realpath(os.path.join(base, relative_path))
+    if os.path.commonpath([base, path]) != base:
+        return None
+    return path
+
+
 def execute_tool(tool_name, arguments, snap_dir):
     """
     Execute a tool function and return the result
@@ -131,8 +162,12 @@ def execute_tool(tool_name, arguments, snap_dir):
         String result of the tool execution
     """
     try:
+        if tool_name in ("read_file", "write_file"):
+            file_path = resolve_snap_path(snap_dir, arguments['file_path'])
+            if file_path is None:
+                return f"Error: {arguments['file_path']} is outside the allowed directory."
+
         if tool_name == "read_file":
-            file_path = os.path.join(snap_dir, arguments['file_path'])
             if os.path.exists(file_path):
                 with open(file_path, 'r') as f:
                     return f.read()
@@ -140,7 +175,6 @@ def execute_tool(tool_name, arguments, snap_dir):
                 return f"File {arguments['file_path']} does not exist yet."
 
         elif tool_name == "write_file":
-            file_path = os.path.join(snap_dir, arguments['file_path'])
             mode = arguments['mode']
             content = arguments['content']
 
@@ -213,6 +247,278 @@ def run_agent_loop(client, model, messages, snap_dir, max_iterations=10):
     return '\n'.join(analysis_output) if analysis_output else "Analysis completed."
 
 
+def get_llm_config():
+    """
+    Read LLM provider settings from the environment (usually ~/.snap/.env)
+
+    Supported variables:
+        SNAPTASK_PROVIDER: 'openai' (default) or 'local' for any
+            OpenAI-compatible server (llama.cpp, vLLM, Ollama, ...)
+        SNAPTASK_BASE_URL: API base URL, e.g. http://localhost:8080/v1
+        SNAPTASK_OCR_MODEL: Model used for OCR text analysis
+        SNAPTASK_VISION_MODEL: Model used for screenshot analysis
+        SNAPTASK_TOOL_CALLING: 'auto' (default, probe the server), 'on' or 'off'
+
+    Returns:
+        Dict with provider, base_url, ocr_model, vision_model and tool_calling
+    """
+    provider = get_provider()
+    base_url = os.getenv('SNAPTASK_BASE_URL', '').strip() or None
+
+    if provider == 'local' and base_url is None:
+        base_url = DEFAULT_LOCAL_BASE_URL
+
+    return {
+        'provider': provider,
+        'base_url': base_url,
+        'ocr_model': os.getenv('SNAPTASK_OCR_MODEL', '').strip() or DEFAULT_OCR_MODEL,
+        'vision_model': os.getenv('SNAPTASK_VISION_MODEL', '').strip() or DEFAULT_VISION_MODEL,
+        'tool_calling': os.getenv('SNAPTASK_TOOL_CALLING', 'auto').strip().lower(),
+    }
+
+
+def is_local_provider():
+    """Return True if SnapTask is configured to use a local OpenAI-compatible server"""
+    return get_provider() == 'local'
+
+
+def create_llm_client(config, api_key=None):
+    """
+    Create an OpenAI client for the configured provider
+
+    Args:
+        config: Dict returned by get_llm_config()
+        api_key: Optional API key (defaults to OPENAI_API_KEY)
+
+    Returns:
+        OpenAI client instance
+    """
+    # Lazy import - only load when needed
+    from openai import OpenAI
+
+    if api_key is None:
+        api_key = os.getenv('OPENAI_API_KEY')
+
+    if not api_key:
+        if config['provider'] != 'local':
+            raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
+        # Local servers usually ignore the key, but the client requires one
+        api_key = 'not-needed'
+
+    if config['base_url']:
+        return OpenAI(api_key=api_key, base_url=config['base_url'])
+    return OpenAI(api_key=api_key)
+
+
+# Tool-calling probe results, keyed by (base_url, model). Persisted to
+# TOOL_SUPPORT_FILE so each capture (one process) doesn't re-probe the server.
+TOOL_SUPPORT_FILE = os.path.join(SNAP_DIR, 'tool_support.json')
+_tool_support_cache = {}
+_tool_support_lock = threading.Lock()
+
+
+def _load_tool_support():
+    """Read persisted probe results into _tool_support_cache"""
+    try:
+        with open(TOOL_SUPPORT_FILE, 'r') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return
+    for entry in saved if isinstance(saved, list) else []:
+        try:
+            _tool_support_cache[(entry['base_url'], entry['model'])] = bool(entry['supported'])
+        except (KeyError, TypeError):
+            continue
+
+
+def _save_tool_support():
+    """Write _tool_support_cache to TOOL_SUPPORT_FILE atomically"""
+    entries = [
+        {'base_url': base_url, 'model': model, 'supported': supported}
+        for (base_url, model), supported in _tool_support_cache.items()
+    ]
+    try:
+        os.makedirs(os.path.dirname(TOOL_SUPPORT_FILE), exist_ok=True)
+        tmp_path = f"{TOOL_SUPPORT_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f, indent=2)
+        os.replace(tmp_path, TOOL_SUPPORT_FILE)
+    except OSError:
+        pass  # Not fatal, we'll just probe again next run
+
+
+def supports_tool_calling(client, model, config):
+    """
+    Check whether the model behind client supports OpenAI function calling
+
+    OpenAI models always do. For local servers a tiny request with a single
+    tool is sent; servers without tool support either reject it or answer
+    without a tool call. A clean answer, or a 400/422 rejecting tools, is
+    saved in ~/.snap/tool_support.json and reused until the base URL or model
+    changes; other errors are treated as transient and not saved.
+    SNAPTASK_TOOL_CALLING=on/off skips the probe.
+
+    Returns:
+        bool: True if run_agent_loop can be used
+    """
+    setting = config['tool_calling']
+    if setting in ('on', 'true', '1', 'yes'):
+        return True
+    if setting in ('off', 'false', '0', 'no'):
+        return False
+    if config['provider'] != 'local':
+        return True
+
+    cache_key = (config['base_url'], model)
+    with _tool_support_lock:
+        if not _tool_support_cache:
+            _load_tool_support()
+        if cache_key in _tool_support_cache:
+            return _tool_support_cache[cache_key]
+
+    probe_tool = {
+        "type": "function",
+        "function": {
+            "name": "ping",
+            "description": "Call this function to answer.",
+            "parameters": {"type": "object", "properties": {}}
+        }
+    }
+
+    from openai import APIStatusError
+
+    # run_agent_loop relies on tool_choice="auto"; "required" forces a clearer
+    # answer from the model, but some servers (older vLLM) only accept "auto"
+    for tool_choice in ("required", "auto"):
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": "Call the ping function."}],
+                tools=[probe_tool],
+                tool_choice=tool_choice,
+                max_tokens=32,
+                temperature=0
+            )
+            supported = bool(response.choices[0].message.tool_calls)
+            break
+        except APIStatusError as e:
+            if e.status_code not in (400, 422):
+                # 5xx, 429, "model loading"...: say no for now, but don't remember it
+                return False
+            if tool_choice == "auto":
+                # The server rejects tools outright
+                supported = False
+        except Exception:
+            # Server unreachable or other transient failure: don't remember it
+            return False
+
+    with _tool_support_lock:
+        _tool_support_cache[cache_key] = supported
+        _save_tool_support()
+    return supported
+
+
+def run_prompt_fallback(client, model, messages, snap_dir):
+    """
+    Analyze without tool calling, for models that don't support it
+
+    The current todo.md and focused.md are inlined into the conversation and
+    the model is asked to list new todos and its focus in a fixed format,
+    which is then parsed and written to the files here.
+
+    Args:
+        client: OpenAI client instance
+        model: Model name
+        messages: Initial message list
+        snap_dir: Base directory for file operations
+
+    Returns:
+        String containing the analysis output
+    """
+    todo_path = os.path.join(snap_dir, 'todo.md')
+    focused_path = os.path.join(snap_dir, 'focused.md')
+
+    existing_todos = ''
+    if os.path.exists(todo_path):
+        with open(todo_path, 'r') as f:
+            existing_todos = f.read()
+
+    existing_focus = ''
+    if os.path.exists(focused_path):
+        with open(focused_path, 'r') as f:
+            existing_focus = f.read()
+
+    messages = messages + [{
+        "role": "user",
+        "content": FALLBACK_INSTRUCTIONS.format(
+            todos=existing_todos.strip() or '(empty)',
+            focus=existing_focus.strip() or '(empty)'
+        )
+    }]
+
+    response = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        max_tokens=1500,
+        temperature=0.7
+    )
+    content = response.choices[0].message.content or ''
+
+    analysis_lines = []
+    new_todos = []
+    new_focus = None
+
+    for line in content.splitlines():
+        stripped = line.strip()
+        if stripped.upper().startswith('TODO:'):
+            task = stripped[len('TODO:'):].strip()
+            if task.startswith('- [ ]'):
+                task = task[len('- [ ]'):].strip()
+            if task and task not in existing_todos:
+                new_todos.append(f"- [ ] {task}\n")
+        elif stripped.upper().startswith('FOCUS:'):
+            new_focus = stripped[len('FOCUS:'):].strip() or None
+        else:
+            analysis_lines.append(line)
+
+    if new_todos:
+        execute_tool("write_file", {
+            'file_path': 'todo.md',
+            'content': ''.join(new_todos),
+            'mode': 'append'
+        }, snap_dir)
+
+    if new_focus and new_focus not in existing_focus:
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
+        execute_tool("write_file", {
+            'file_path': 'focused.md',
+            'content': f"- {timestamp}: {new_focus}\n",
+            'mode': 'append'
+        }, snap_dir)
+
+    analysis = '\n'.join(analysis_lines).strip()
+    return analysis if analysis else "Analysis completed."
+
+
+def run_analysis(client, model, messages, snap_dir, config):
+    """
+    Run the analysis with tools when the model supports them, else fall back
+
+    Args:
+        client: OpenAI client instance
+        model: Model name
+        messages: Initial message list
+        snap_dir: Base directory for file operations
+        config: Dict returned by get_llm_config()
+
+    Returns:
+        String containing the analysis output
+    """
+    if supports_tool_calling(client, model, config):
+        return run_agent_loop(client, model, messages, snap_dir)
+    return run_prompt_fallback(client, model, messages, snap_dir)
+
+
 def create_prompt_file(prompt_file, default_content):
     """Create a prompt file if it doesn't exist"""
     if not os.path.exists(prompt_file):
@@ -234,14 +540,6 @@ def save_analysis(screenshot_path, analysis):
     return analysis_path
 
 
-def generate_screenshot_path():
-    """Generate timestamped screenshot path"""
-    screenshots_dir = os.path.expanduser('~/.snap')
-    os.makedirs(screenshots_dir, exist_ok=True)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    return os.path.join(screenshots_dir, f'screenshot_{timestamp}.png')
-
-
 def ensure_env_file_exists():
     """
     Create .env file on first run - interactive in terminal, guided in GUI.
@@ -251,7 +549,26 @@ def ensure_env_file_exists():
     """
     import sys
 
-    env_file = os.path.expanduser('~/.snap/.env')
+    env_file = ENV_FILE
+
+    # Uploading to a SnapTask server doesn't need a local API key
+    if get_server_url() and not os.path.exists(env_file):
+        return True
+
+    # Local OpenAI-compatible servers don't need one either
+    if is_local_provider() and not os.path.exists(env_file):
+        os.makedirs(os.path.dirname(env_file), exist_ok=True)
+        with open(env_file, 'w') as f:
+            f.write('# SnapTask Configuration\n')
+            f.write('# Generated by SnapTask setup (local LLM provider, no API key needed)\n\n')
+            f.write('SNAPTASK_PROVIDER=local\n')
+            base_url = os.getenv('SNAPTASK_BASE_URL', '').strip()
+            if base_url:
+                f.write(f'SNAPTASK_BASE_URL={base_url}\n')
+
+        os.chmod(env_file, 0o600)
+        print(f"✅ Configuration saved to {env_file}")
+        return True
 
     if not os.path.exists(env_file):
         os.makedirs(os.path.dirname(env_file), exist_ok=True)
@@ -298,7 +615,14 @@ def ensure_env_file_exists():
             return False
 
     # Check if API key is set (not placeholder)
+    from dotenv import load_dotenv
+
     load_dotenv(env_file)
+
+    # Local OpenAI-compatible servers and SnapTask servers don't need an API key
+    if is_local_provider() or get_server_url():
+        return True
+
     api_key = os.getenv('OPENAI_API_KEY')
 
     if not api_key or api_key == 'your-api-key-here':
@@ -321,26 +645,108 @@ def load_env_config():
     """
     Load environment variables from ~/.snap/.env file.
 
-    This allows the binary to read OPENAI_API_KEY from a config file
-    when run from GUI apps (Shortcuts, Automator) that don't have
+    This allows the binary to read OPENAI_API_KEY (and the SNAPTASK_*
+    provider settings) from a config file when run from GUI apps (Shortcuts, Automator) that don't have
     shell environment variables.
     """
-    env_file = os.path.expanduser('~/.snap/.env')
-    if os.path.exists(env_file):
-        load_dotenv(env_file)
+    if os.path.exists(ENV_FILE):
+        from dotenv import load_dotenv
 
+        load_dotenv(ENV_FILE)
 
-def show_notification(title, message):
-    """Display macOS notification using osascript"""
-    try:
-        # Escape double quotes and backslashes in the message
-        safe_title = title.replace('\\', '\\\\').replace('"', '\\"')
-        safe_message = message.replace('\\', '\\\\').replace('"', '\\"')
-
-        subprocess.call([
-            'osascript', '-e',
-            f'display notification "{safe_message}" with title "{safe_title}"'
-        ])
-    except Exception as e:
-        # Silently fail if notification doesn't work
-        pass
+
+def get_server_url():
+    """Return the SnapTask server URL (SNAPTASK_SERVER_URL) or None for local analysis"""
+    url = os.getenv('SNAPTASK_SERVER_URL', '').strip()
+    return url.rstrip('/') if url else None
+
+
+def get_user_id():
+    """Return the user ID sent to the SnapTask server (SNAPTASK_USER, defaults to login name)"""
+    import getpass
+
+    return os.getenv('SNAPTASK_USER', '').strip() or getpass.getuser()
+
+
+# Must exceed the server's job timeout (snaptask_server.DEFAULT_JOB_TIMEOUT,
+# 300s) so a slow queued job comes back as the server's 504, not a socket timeout
+UPLOAD_TIMEOUT = 330
+UPLOAD_MAX_ATTEMPTS = 5
+UPLOAD_MAX_RETRY_DELAY = 30
+
+
+def upload_for_analysis(server_url, user_id, body, content_type, timeout=UPLOAD_TIMEOUT,
+                        max_attempts=UPLOAD_MAX_ATTEMPTS):
+    """
+    Send a screenshot or OCR result to a SnapTask server for analysis
+
+    Retries when the server is busy (503), waiting as long as its
+    Retry-After header asks.
+
+    Args:
+        server_url: Base URL of the server (e.g., 'http://snaptask.local:8765')
+        user_id: User ID whose todo.md/focused.md the server should update
+        body: Request body (PNG bytes or OCR JSON bytes)
+        content_type: 'image/png' or 'application/json'
+        timeout: Seconds to wait for the analysis
+        max_attempts: Attempts before giving up on a busy server
+
+    Returns:
+        String containing the analysis output
+    """
+    import socket
+    import time
+    import urllib.request
+    import urllib.error
+
+    for attempt in range(1, max_attempts + 1):
+        request = urllib.request.Request(
+            f"{server_url}/analyze",
+            data=body,
+            method='POST',
+            headers={
+                'Content-Type': content_type,
+                'X-SnapTask-User': user_id,
+            }
+        )
+
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                result = json.loads(response.read().decode('utf-8'))
+            return result.get('analysis', "Analysis completed.")
+        except urllib.error.HTTPError as e:
+            if e.code == 503 and attempt < max_attempts:
+                try:
+                    delay = float(e.headers.get('Retry-After', '1'))
+                except ValueError:
+                    delay = 1.0
+                delay = min(max(delay, 0.0), UPLOAD_MAX_RETRY_DELAY)
+                print(f"   Server busy, retrying in {delay:g}s ({attempt}/{max_attempts - 1})...")
+                time.sleep(delay)
+                continue
+            try:
+                error = json.loads(e.read().decode('utf-8')).get('error', e.reason)
+            except ValueError:
+                error = e.reason
+            raise RuntimeError(f"Server returned {e.code}: {error}")
+        except (TimeoutError, socket.timeout):
+            raise RuntimeError(f"SnapTask server at {server_url} didn't respond within {timeout:g}s")
+        except urllib.error.URLError as e:
+            if isinstance(e.reason, (TimeoutError, socket.timeout)):
+                raise RuntimeError(f"SnapTask server at {server_url} didn't respond within {timeout:g}s")
+            raise RuntimeError(f"Could not reach SnapTask server at {server_url}: {e.reason}")
+
+
+def warm_imports(module_names):
+    """
+    Import modules ahead of time, e.g. while the user is selecting an area
+
+    Failures are ignored here; they surface again where the module is used.
+    """
+    import importlib
+
+    for name in module_names:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Load test for the SnapTask server - reports sustained throughput and latency
+
+Usage:
+    python loadtest.py --url http://localhost:8765 --requests 200 --concurrency 16
+    python loadtest.py --png screenshot.png --users 4   # vision uploads instead of OCR JSON
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+SAMPLE_OCR_RESULT = {
+    'full_text': "def main():\n    print('hello')\nTraceback (most recent call last):\nValueError: bad input",
+    'blocks': [],
+    'total_blocks': 4
+}
+
+
+def send_request(url, user_id, body, content_type, max_attempts, timeout):
+    """
+    Send one upload, retrying while the server answers 503
+
+    Returns:
+        Tuple of (status, latency_seconds, busy_responses), status 0 on connection errors
+    """
+    busy = 0
+    start = time.perf_counter()
+
+    for _ in range(max_attempts):
+        request = urllib.request.Request(
+            f"{url}/analyze",
+            data=body,
+            method='POST',
+            headers={'Content-Type': content_type, 'X-SnapTask-User': user_id}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                return response.status, time.perf_counter() - start, busy
+        except urllib.error.HTTPError as e:
+            if e.code != 503:
+                return e.code, time.perf_counter() - start, busy
+            busy += 1
+            time.sleep(float(e.headers.get('Retry-After', '1')))
+        except (urllib.error.URLError, OSError):
+            return 0, time.perf_counter() - start, busy
+
+    return 503, time.perf_counter() - start, busy
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test a SnapTask server')
+    parser.add_argument('--url', default='http://127.0.0.1:8765', help='Server base URL')
+    parser.add_argument('--requests', type=int, default=100, help='Total number of uploads')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client connections')
+    parser.add_argument('--users', type=int, default=4, help='Number of distinct user IDs to spread load over')
+    parser.add_argument('--png', help='Upload this PNG (vision mode) instead of a sample OCR JSON')
+    parser.add_argument('--max-attempts', type=int, default=20, help='Attempts per upload while the server is busy')
+    parser.add_argument('--timeout', type=float, default=300, help='Per-request timeout in seconds')
+    args = parser.parse_args()
+
+    if args.png:
+        with open(args.png, 'rb') as f:
+            body = f.read()
+        content_type = 'image/png'
+    else:
+        body = json.dumps(SAMPLE_OCR_RESULT).encode('utf-8')
+        content_type = 'application/json'
+
+    results = []
+    results_lock = threading.Lock()
+
+    def worker(i):
+        user_id = f"loadtest-{i % args.users}"
+        result = send_request(args.url, user_id, body, content_type, args.max_attempts, args.timeout)
+        with results_lock:
+            results.append(result)
+
+    print(f"🚀 Sending {args.requests} {content_type} uploads to {args.url} "
+          f"({args.concurrency} concurrent, {args.users} users)...")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(worker, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for status, latency, _ in results if status == 200]
+    succeeded = len(latencies)
+    failed = len(results) - succeeded
+    connection_errors = sum(1 for status, _, _ in results if status == 0)
+    busy = sum(b for _, _, b in results)
+
+    print("\n" + "="*60)
+    print("📊 LOAD TEST RESULTS")
+    print("="*60)
+    print(f"Completed:      {succeeded}/{len(results)} ({failed} failed)")
+    print(f"Conn. errors:   {connection_errors}")
+    print(f"Busy (503):     {busy} responses (retried)")
+    print(f"Elapsed:        {elapsed:.2f}s")
+    print(f"Throughput:     {succeeded / elapsed if elapsed else 0:.2f} req/s")
+    print(f"Latency p50:    {percentile(latencies, 50) * 1000:.0f} ms")
+    print(f"Latency p95:    {percentile(latencies, 95) * 1000:.0f} ms")
+    print(f"Latency p99:    {percentile(latencies, 99) * 1000:.0f} ms")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Screenshot Analyzer (OCR Version) - Uses Apple Vision for OCR + GPT-4o-mini for analysis
+Screenshot Analyzer (OCR Version) - Uses Apple Vision for OCR + GPT-4o-mini (or a local LLM) for analysis
 Much cheaper than full vision API (~15x cost reduction)
 """
 
@@ -64,25 +64,40 @@ def extract_text_with_vision(image_path):
         return None
 
 
-def analyze_text_with_llm(ocr_result, api_key=None):
-    """Send extracted text to GPT-4o-mini for analysis with file management tools"""
-    # Lazy import - only load when needed
-    from openai import OpenAI
-    from common import load_prompt, run_agent_loop, get_system_message, DEFAULT_OCR_PROMPT
+def analyze_text_with_llm(ocr_result, api_key=None, snap_dir=None, client=None, config=None):
+    """
+    Send extracted text to the configured LLM (GPT-4o-mini by default) for analysis
 
-    if api_key is None:
-        api_key = os.getenv('OPENAI_API_KEY')
+    Args:
+        ocr_result: Dict returned by extract_text_with_vision()
+        api_key: Optional API key (defaults to OPENAI_API_KEY)
+        snap_dir: Directory holding todo.md/focused.md (defaults to ~/.snap)
+        client: Optional shared OpenAI client (created from config if omitted)
+        config: Optional dict returned by get_llm_config()
 
-    if not api_key:
-        raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
+    Returns:
+        String containing the analysis output
+    """
+    from common import (
+        load_prompt,
+        run_analysis,
+        get_system_message,
+        get_llm_config,
+        create_llm_client,
+        DEFAULT_OCR_PROMPT
+    )
 
-    client = OpenAI(api_key=api_key)
+    if config is None:
+        config = get_llm_config()
+    if client is None:
+        client = create_llm_client(config, api_key)
 
     if not ocr_result or not ocr_result.get('full_text'):
         return "No text found in screenshot."
 
     text = ocr_result['full_text']
-    snap_dir = os.path.expanduser('~/.snap')
+    if snap_dir is None:
+        snap_dir = os.path.expanduser('~/.snap')
 
     # Load custom prompt or use default
     prompt_template = load_prompt('ocr_prompt.txt', DEFAULT_OCR_PROMPT)
@@ -100,8 +115,8 @@ def analyze_text_with_llm(ocr_result, api_key=None):
         }
     ]
 
-    # Run agent loop
-    return run_agent_loop(client, "gpt-4o-mini", messages, snap_dir)
+    # Run agent loop (or plain prompt if the model can't call tools)
+    return run_analysis(client, config['ocr_model'], messages, snap_dir, config)
 
 def create_default_prompts():
     """Create default prompt files if they don't exist"""
@@ -113,36 +128,62 @@ def create_default_prompts():
 
 def main():
     """Main execution flow"""
-    # Import only what's needed for initial setup and screenshot
+    # Only the stdlib capture path is imported before screencapture launches
+    from snaptask_capture import (
+        ENV_FILE,
+        env_file_exists,
+        env_file_has_placeholder_key,
+        generate_screenshot_path,
+        start_capture,
+        finish_capture
+    )
+
+    # First-run setup is interactive, so it has to finish before capture starts.
+    # An unedited placeholder key is caught here too, without loading dotenv.
+    if not env_file_exists() or env_file_has_placeholder_key():
+        from common import ensure_env_file_exists
+        if not ensure_env_file_exists():
+            return  # Setup needed, exit gracefully
+
+    # Generate screenshot path
+    screenshot_path = generate_screenshot_path()
+
+    # Launch screencapture right away, then do the slow setup while the user selects
+    print("📸 Capturing screenshot...")
+    print("   → Drag to select area, or press SPACE to select window, ESC to cancel")
+    capture = start_capture(screenshot_path)
+
     from common import (
         ensure_env_file_exists,
         load_env_config,
-        generate_screenshot_path,
-        capture_screenshot,
+        get_server_url,
         save_analysis,
-        show_notification
+        show_notification,
+        warm_imports
     )
 
-    # Ensure .env file exists and is configured
-    if not ensure_env_file_exists():
-        return  # Setup needed, exit gracefully
-
     # Load environment from ~/.snap/.env
     load_env_config()
 
     # Create default prompt files if they don't exist
     create_default_prompts()
 
-    # Generate screenshot path
-    screenshot_path = generate_screenshot_path()
+    # OCR runs locally even when a SnapTask server does the analysis
+    modules = ['Foundation', 'Vision']
+    if not get_server_url():
+        modules.append('openai')
+    warm_imports(modules)
 
-    # Capture screenshot - THIS HAPPENS FAST NOW!
-    print("📸 Capturing screenshot...")
-    print("   → Drag to select area, or press SPACE to select window, ESC to cancel")
-    if not capture_screenshot(screenshot_path):
+    if not finish_capture(capture, screenshot_path):
         print("   Screenshot canceled or failed")
         return
 
+    # Validate the config only now, so setup messages don't pop up mid-selection
+    if not ensure_env_file_exists():
+        os.remove(screenshot_path)
+        print(f"   Screenshot discarded: SnapTask setup is incomplete, edit {ENV_FILE} and capture again")
+        return
+
     # Extract text using Apple Vision
     print("🔍 Extracting text with Apple Vision OCR...")
     ocr_result = extract_text_with_vision(screenshot_path)
@@ -158,10 +199,19 @@ def main():
         print("   No text extracted")
         return
 
-    # Analyze with LLM
-    print("\n🤖 Analyzing with GPT-4o-mini...")
+    # Analyze with LLM, or let a SnapTask server do it
+    from common import get_llm_config, get_user_id, upload_for_analysis
+    server_url = get_server_url()
+    if server_url:
+        print(f"\n☁️  Sending text to SnapTask server at {server_url}...")
+    else:
+        print(f"\n🤖 Analyzing with {get_llm_config()['ocr_model']}...")
     try:
-        analysis = analyze_text_with_llm(ocr_result)
+        if server_url:
+            body = json.dumps(ocr_result).encode('utf-8')
+            analysis = upload_for_analysis(server_url, get_user_id(), body, 'application/json')
+        else:
+            analysis = analyze_text_with_llm(ocr_result)
         print("\n" + "="*60)
         print("📊 ANALYSIS")
         print("="*60)
@@ -1,6 +1,8 @@
 # -*- mode: python ; coding: utf-8 -*-
 # PyInstaller spec file for SnapTask
 # This bundles all Python dependencies and PyObjC frameworks into a single binary
+# The onefile binary unpacks itself to a temp dir on every run; see
+# snaptask_onedir.spec for a faster-starting directory build
 
 block_cipher = None
 
@@ -13,6 +15,10 @@ a = Analysis(
         # SnapTask modules (imported by CLI)
         'snaptask',
         'snaptask_vision',
+        'snaptask_server',
+        'snaptask_capture',
+        'snaptask_profile',
+        'common',
         # PyObjC frameworks (required for macOS Vision and screen capture)
         'Vision',
         'Quartz',
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Capture path for SnapTask - everything needed before screencapture launches
+
+This module only uses the standard library so the screenshot UI appears as
+soon as possible. Config loading (dotenv), the OpenAI client and PyObjC are
+imported afterwards, while the user is still selecting an area.
+"""
+
+import subprocess
+import os
+from datetime import datetime
+
+
+SNAP_DIR = os.path.expanduser('~/.snap')
+ENV_FILE = os.path.join(SNAP_DIR, '.env')
+
+
+def get_provider():
+    """Return the configured LLM provider (SNAPTASK_PROVIDER), 'openai' by default"""
+    return os.getenv('SNAPTASK_PROVIDER', '').strip().lower() or 'openai'
+
+
+def env_file_exists():
+    """Return True if ~/.snap/.env exists (first-run setup already happened)"""
+    return os.path.exists(ENV_FILE)
+
+
+def env_file_has_placeholder_key():
+    """
+    Return True if ~/.snap/.env still holds the placeholder API key
+
+    A plain text scan rather than dotenv, so it's cheap enough to run before
+    screencapture launches.
+    """
+    try:
+        with open(ENV_FILE, 'r') as f:
+            for line in f:
+                key, _, value = line.strip().partition('=')
+                if key.strip() == 'OPENAI_API_KEY':
+                    return value.strip().strip('"\'') == 'your-api-key-here'
+    except OSError:
+        pass
+    return False
+
+
+def generate_screenshot_path():
+    """Generate timestamped screenshot path"""
+    os.makedirs(SNAP_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(SNAP_DIR, f'screenshot_{timestamp}.png')
+
+
+def start_capture(output_path):
+    """
+    Launch macOS screencapture without waiting for it
+
+    Returns:
+        Popen handle to pass to finish_capture(), or None if it couldn't start
+    """
+    try:
+        # -i: interactive selection (drag to select area, spacebar for window)
+        # -x: no sound, -t png: format
+        return subprocess.Popen(['screencapture', '-i', '-x', '-t', 'png', output_path])
+    except OSError as e:
+        print(f"Error capturing screenshot: {e}")
+        return None
+
+
+def finish_capture(process, output_path):
+    """
+    Wait for a screencapture started by start_capture()
+
+    Returns:
+        bool: True if a screenshot was saved, False if canceled or failed
+    """
+    if process is None:
+        return False
+
+    returncode = process.wait()
+    # ESC exits 0 without writing a file
+    if returncode != 0 or not os.path.exists(output_path):
+        if returncode != 0:
+            print(f"Error capturing screenshot: screencapture exited with status {returncode}")
+        return False
+
+    print(f"Screenshot saved to: {output_path}")
+    return True
+
+
+def capture_screenshot(output_path):
+    """Capture screenshot using macOS screencapture command"""
+    return finish_capture(start_capture(output_path), output_path)
+
+
+def show_notification(title, message):
+    """Display macOS notification using osascript"""
+    try:
+        # Escape double quotes and backslashes in the message
+        safe_title = title.replace('\\', '\\\\').replace('"', '\\"')
+        safe_message = message.replace('\\', '\\\\').replace('"', '\\"')
+
+        subprocess.call([
+            'osascript', '-e',
+            f'display notification "{safe_message}" with title "{safe_title}"'
+        ])
+    except Exception as e:
+        # Silently fail if notification doesn't work
+        pass
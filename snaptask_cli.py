@@ -3,6 +3,13 @@
 SnapTask CLI - Command-line interface for SnapTask
 """
 
+import time
+
+# Taken first so --profile-startup can include CLI import time. The wall-clock
+# stamp is compared with the onefile extraction dir's birth time.
+_CLI_START = time.perf_counter()
+_CLI_WALL_START = time.time()
+
 import argparse
 import sys
 import os
@@ -20,6 +27,22 @@ def run_snaptask(use_vision=False):
         import snaptask
         snaptask.main()
 
+def run_serve(args):
+    """Run the SnapTask analysis server"""
+    import snaptask_server
+
+    try:
+        snaptask_server.run_server(
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            queue_size=args.queue_size,
+            data_dir=args.data_dir
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -30,6 +53,9 @@ Examples:
   snaptask              # Capture and analyze (OCR mode)
   snaptask --vision     # Capture and analyze (Vision mode)
   snaptask -v           # Same as --vision
+  snaptask --server http://host:8765   # Capture locally, analyze on a SnapTask server
+  snaptask serve        # Run the analysis server for multiple clients
+  snaptask --profile-startup           # Show where cold-start time goes
 
 For more info, see: README.md in the SnapTask repository
         """
@@ -47,10 +73,55 @@ For more info, see: README.md in the SnapTask repository
         version='SnapTask 1.0.0'
     )
 
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Report per-phase and per-import startup timing without capturing'
+    )
+
+    parser.add_argument(
+        '--server',
+        metavar='URL',
+        help='Upload captures to a SnapTask server instead of analyzing locally (or set SNAPTASK_SERVER_URL)'
+    )
+
+    parser.add_argument(
+        '--user',
+        help='User ID to send to the SnapTask server (or set SNAPTASK_USER, defaults to login name)'
+    )
+
+    subparsers = parser.add_subparsers(dest='command')
+    serve_parser = subparsers.add_parser(
+        'serve',
+        help='Run an analysis server that accepts uploads from many SnapTask clients'
+    )
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    serve_parser.add_argument('--workers', type=int, default=4, help='Number of analysis workers (default: 4)')
+    serve_parser.add_argument('--queue-size', type=int, default=32,
+                              help='Queued requests before the server answers 503 (default: 32)')
+    serve_parser.add_argument('--data-dir', help='Root for per-user directories (default: ~/.snap)')
+
     args = parser.parse_args()
 
+    if args.command == 'serve':
+        run_serve(args)
+        return
+
+    if args.profile_startup:
+        import snaptask_profile
+        snaptask_profile.profile_startup(_CLI_START, _CLI_WALL_START, use_vision=args.vision)
+        return
+
+    if args.server:
+        os.environ['SNAPTASK_SERVER_URL'] = args.server
+    if args.user:
+        os.environ['SNAPTASK_USER'] = args.user
+
     # Check if OpenAI API key is set
-    if not os.getenv('OPENAI_API_KEY'):
+    from snaptask_capture import get_provider
+    if (not os.getenv('OPENAI_API_KEY') and not os.getenv('SNAPTASK_SERVER_URL')
+            and get_provider() != 'local'):
         print("⚠️  Warning: OPENAI_API_KEY environment variable not set")
         print("   Add to your ~/.zshrc: export OPENAI_API_KEY='sk-...'")
         print("   Then: source ~/.zshrc")
@@ -0,0 +1,77 @@
+# -*- mode: python ; coding: utf-8 -*-
+# PyInstaller spec file for SnapTask - directory (onedir) build
+# Produces dist/snaptask/ with the executable next to its libraries, so nothing
+# is extracted at startup. Faster cold start than snaptask.spec's single binary.
+
+block_cipher = None
+
+a = Analysis(
+    ['snaptask_cli.py'],  # Only the CLI is the entry point
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=[
+        # SnapTask modules (imported by CLI)
+        'snaptask',
+        'snaptask_vision',
+        'snaptask_server',
+        'snaptask_capture',
+        'snaptask_profile',
+        'common',
+        # PyObjC frameworks (required for macOS Vision and screen capture)
+        'Vision',
+        'Quartz',
+        'objc',
+        'Foundation',
+        'CoreGraphics',
+        'AppKit',
+        # OpenAI API
+        'openai',
+        'openai.types',
+        'openai.types.chat',
+        # Standard library modules that might not be auto-detected
+        'json',
+        'base64',
+        'subprocess',
+        'os',
+        'datetime',
+    ],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=[],
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    noarchive=False,
+)
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,  # Libraries go into the COLLECT directory below
+    name='snaptask',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,  # UPX-compressed libraries would be decompressed on every start
+    console=True,  # CLI tool, needs console output
+    disable_windowed_traceback=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='snaptask',
+)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Cold-start profiler for SnapTask (snaptask --profile-startup)
+
+Walks the same startup path as a real capture - without opening the
+screenshot UI - and reports how long each phase and each import takes.
+Run it from the built binary to see bootloader/extraction overhead too.
+"""
+
+import importlib
+import os
+import sys
+import time
+
+
+# Imports in the order a capture loads them, grouped by phase
+CAPTURE_IMPORTS = ['snaptask_capture']
+CONFIG_IMPORTS = ['common', 'dotenv']
+OCR_IMPORTS = ['snaptask', 'Foundation', 'Vision']
+VISION_IMPORTS = ['snaptask_vision']
+LLM_IMPORTS = ['openai']
+
+
+def get_build_variant():
+    """Return 'onefile', 'onedir' or 'source' depending on how SnapTask is running"""
+    if not getattr(sys, 'frozen', False):
+        return 'source'
+    # Onefile builds extract into a fresh _MEIxxxxxx temp dir on every run
+    if os.path.basename(getattr(sys, '_MEIPASS', '')).startswith('_MEI'):
+        return 'onefile'
+    return 'onedir'
+
+
+def estimate_bootloader_time(cli_wall_start):
+    """
+    Approximate seconds from onefile extraction starting to the CLI loading
+
+    The onefile bootloader creates its _MEI temp dir before unpacking, so
+    the directory's birth time marks (roughly) when extraction started.
+    ctime is no substitute: it moves with every file extracted into the dir.
+
+    Args:
+        cli_wall_start: time.time() value taken when the CLI module loaded
+
+    Returns:
+        Float seconds, or None if not a onefile build or birth time is unavailable
+    """
+    if get_build_variant() != 'onefile':
+        return None
+    try:
+        birthtime = getattr(os.stat(sys._MEIPASS), 'st_birthtime', None)
+    except OSError:
+        return None
+    if birthtime is None:
+        return None
+    return max(0.0, cli_wall_start - birthtime)
+
+
+class StartupProfiler:
+    """Collects per-phase and per-import timings"""
+
+    def __init__(self):
+        self.phases = []
+        self.imports = []
+
+    def time_imports(self, module_names):
+        """
+        Import modules in order, recording the incremental cost of each
+
+        Modules already loaded (or missing) are recorded too so the report
+        shows the whole path.
+        """
+        for name in module_names:
+            if name in sys.modules:
+                self.imports.append((name, 0.0, 'already loaded'))
+                continue
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+                status = ''
+            except Exception as e:
+                status = f'failed: {type(e).__name__}'
+            self.imports.append((name, time.perf_counter() - start, status))
+
+    def phase(self, name, func, *args):
+        """Run func(*args) as a named phase and record its duration"""
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception as e:
+            result = None
+            name = f'{name} (failed: {type(e).__name__})'
+        self.phases.append((name, time.perf_counter() - start))
+        return result
+
+    def report(self, bootloader_time, cli_time, capture_time, total_time):
+        """Print the timing report (all times in seconds, bootloader_time may be None)"""
+        print("\n" + "="*60)
+        print("⏱️  STARTUP PROFILE")
+        print("="*60)
+        print(f"Build variant:  {get_build_variant()}")
+        print(f"Python:         {sys.version.split()[0]}")
+
+        print("\nPhases:")
+        if get_build_variant() == 'onefile':
+            if bootloader_time is not None:
+                print(f"   {'bootloader + extraction (approx.)':<40} {bootloader_time * 1000:8.1f} ms")
+            else:
+                print(f"   {'bootloader + extraction':<40} {'unavailable':>8}    (no st_birthtime)")
+        print(f"   {'CLI import + argument parsing':<40} {cli_time * 1000:8.1f} ms")
+        for name, duration in self.phases:
+            print(f"   {name:<40} {duration * 1000:8.1f} ms")
+        print(f"   {'TOTAL (in Python)':<40} {total_time * 1000:8.1f} ms")
+        print(f"\nscreencapture would launch after {capture_time * 1000:.1f} ms (in Python)")
+
+        print("\nImports (incremental, in load order):")
+        for name, duration, status in self.imports:
+            print(f"   {name:<40} {duration * 1000:8.1f} ms  {status}")
+        print("="*60)
+
+
+def profile_startup(cli_start, cli_wall_start, use_vision=False):
+    """
+    Profile the capture startup path and print a report
+
+    Args:
+        cli_start: time.perf_counter() value taken when the CLI module loaded
+        cli_wall_start: time.time() value taken at the same point
+        use_vision: Profile vision mode instead of OCR mode
+    """
+    profile_start = time.perf_counter()
+    profiler = StartupProfiler()
+
+    # Only this part runs before screencapture launches, so it must stay cheap
+    profiler.phase('pre-capture imports', profiler.time_imports, CAPTURE_IMPORTS)
+
+    from snaptask_capture import env_file_exists
+    profiler.phase('check ~/.snap/.env exists', env_file_exists)
+    capture_ready = time.perf_counter()
+
+    # The rest overlaps with the user selecting an area in a real run
+    profiler.phase('config imports', profiler.time_imports, CONFIG_IMPORTS)
+
+    from common import load_env_config, get_llm_config, create_llm_client
+    profiler.phase('load ~/.snap/.env', load_env_config)
+
+    mode_imports = VISION_IMPORTS if use_vision else OCR_IMPORTS
+    profiler.phase('mode imports (incl. PyObjC)', profiler.time_imports, mode_imports)
+    profiler.phase('LLM client imports', profiler.time_imports, LLM_IMPORTS)
+
+    config = get_llm_config()
+    profiler.phase('create LLM client', create_llm_client, config)
+
+    end = time.perf_counter()
+    profiler.report(
+        estimate_bootloader_time(cli_wall_start),
+        profile_start - cli_start,
+        capture_ready - cli_start,
+        end - cli_start
+    )
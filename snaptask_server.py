@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+SnapTask Server - Central analysis service for multiple SnapTask clients
+
+Clients upload a PNG (vision mode) or an OCR JSON (OCR mode) together with a
+user ID. Requests go into a bounded queue served by a fixed pool of worker
+threads that share one LLM client. Each user gets their own directory with
+todo.md and focused.md under the server's data directory.
+"""
+
+import json
+import os
+import queue
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_JOB_TIMEOUT = 300
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
+# User IDs become directory names, so keep them to a safe character set
+# (checked after lowercasing)
+USER_ID_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_.@-]{0,63}$')
+
+
+class Job:
+    """A single analysis request waiting in the queue"""
+
+    def __init__(self, user_id, kind, payload):
+        self.user_id = user_id
+        self.kind = kind  # 'ocr' or 'vision'
+        self.payload = payload
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.started = False
+        self.cancelled = False  # Client gave up (504) before a worker picked it up
+
+
+class AnalysisService:
+    """
+    Bounded request queue plus a worker pool sharing one LLM client
+
+    Jobs for the same user are serialized so concurrent uploads can't
+    interleave their updates to that user's todo.md/focused.md. Only one job
+    per user is on the shared queue at a time; the rest wait in that user's
+    pending deque, so a burst from one user never ties up more than one
+    worker while other users' jobs are waiting.
+    """
+
+    def __init__(self, data_dir, workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE):
+        from common import get_llm_config, create_llm_client
+
+        self.data_dir = data_dir
+        self.config = get_llm_config()
+        self.client = create_llm_client(self.config)
+        self.queue = queue.Queue()
+        self.queue_size = queue_size
+        self.workers = workers
+        self._threads = []
+        self._lock = threading.Lock()
+        self._waiting = 0  # Jobs not yet started, on the queue or pending
+        self._pending = {}  # user_id -> deque of jobs behind that user's active job
+        self._counter = 0
+        self._counter_guard = threading.Lock()
+
+    def start(self):
+        """Start the worker threads"""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f'snaptask-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, job):
+        """
+        Queue a job without blocking
+
+        Returns:
+            bool: False if the queue is full and the client should retry later
+        """
+        with self._lock:
+            if self._waiting >= self.queue_size:
+                return False
+            self._waiting += 1
+
+            if job.user_id in self._pending:
+                # The user already has a job queued or running; wait behind it
+                self._pending[job.user_id].append(job)
+            else:
+                self._pending[job.user_id] = deque()
+                self.queue.put(job)
+        return True
+
+    def cancel(self, job):
+        """
+        Drop a job that hasn't started yet, freeing its queue slot
+
+        Returns:
+            bool: False if a worker already started the job
+        """
+        with self._lock:
+            if job.started or job.cancelled:
+                return False
+            job.cancelled = True
+            self._waiting -= 1
+
+            # Jobs behind the user's active one can be removed right away; the
+            # active one is on the shared queue and gets skipped by _worker
+            pending = self._pending.get(job.user_id)
+            if pending and job in pending:
+                pending.remove(job)
+            return True
+
+    def waiting(self):
+        """Return the number of accepted jobs that haven't started yet"""
+        with self._lock:
+            return self._waiting
+
+    def user_dir(self, user_id):
+        """Return (and create) the namespaced directory for a user"""
+        path = os.path.join(self.data_dir, 'users', user_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _artifact_base(self, snap_dir):
+        """Unique per-request file prefix, timestamps alone collide under load"""
+        with self._counter_guard:
+            self._counter += 1
+            counter = self._counter
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return os.path.join(snap_dir, f'screenshot_{timestamp}_{counter:06d}')
+
+    def _worker(self):
+        while True:
+            job = self.queue.get()
+            with self._lock:
+                skip = job.cancelled
+                if not skip:
+                    self._waiting -= 1
+                    job.started = True
+            if skip:
+                self._release_user(job.user_id)
+                self.queue.task_done()
+                continue
+
+            try:
+                job.result = self._analyze(job)
+            except Exception as e:
+                job.error = str(e)
+            finally:
+                job.done.set()
+                self._release_user(job.user_id)
+                self.queue.task_done()
+
+    def _release_user(self, user_id):
+        """Queue the user's next pending job, or mark the user idle"""
+        with self._lock:
+            pending = self._pending[user_id]
+            if pending:
+                self.queue.put(pending.popleft())
+            else:
+                del self._pending[user_id]
+
+    def _analyze(self, job):
+        from common import save_analysis
+
+        snap_dir = self.user_dir(job.user_id)
+        base_path = self._artifact_base(snap_dir)
+        screenshot_path = base_path + '.png'
+
+        if job.kind == 'vision':
+            from snaptask_vision import analyze_screenshot
+
+            with open(screenshot_path, 'wb') as f:
+                f.write(job.payload)
+            analysis = analyze_screenshot(
+                screenshot_path, snap_dir=snap_dir, client=self.client, config=self.config
+            )
+        else:
+            from snaptask import analyze_text_with_llm
+
+            with open(base_path + '_ocr.json', 'w') as f:
+                json.dump(job.payload, f, indent=2)
+            analysis = analyze_text_with_llm(
+                job.payload, snap_dir=snap_dir, client=self.client, config=self.config
+            )
+
+        save_analysis(screenshot_path, analysis)
+        return analysis
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end: POST /analyze, GET /health"""
+
+    server_version = 'SnapTask/1.0'
+
+    def do_GET(self):
+        if self.path != '/health':
+            self._send_json(404, {'error': 'Not found'})
+            return
+
+        service = self.server.service
+        self._send_json(200, {
+            'status': 'ok',
+            'workers': service.workers,
+            'queued': service.waiting(),
+            'queue_size': service.queue_size,
+        })
+
+    def do_POST(self):
+        if self.path != '/analyze':
+            self._send_json(404, {'error': 'Not found'})
+            return
+
+        # Lowercased: on case-insensitive filesystems (macOS APFS) 'Alice' and
+        # 'alice' share a directory, so they must share a queue slot too
+        user_id = self.headers.get('X-SnapTask-User', '').strip().lower()
+        if not USER_ID_PATTERN.match(user_id):
+            self._send_json(400, {'error': 'Missing or invalid X-SnapTask-User header'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            self._send_json(411, {'error': 'Content-Length required'})
+            return
+        if length <= 0 or length > MAX_UPLOAD_BYTES:
+            self._send_json(413, {'error': f'Upload must be between 1 and {MAX_UPLOAD_BYTES} bytes'})
+            return
+
+        body = self.rfile.read(length)
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip()
+
+        if content_type == 'image/png':
+            job = Job(user_id, 'vision', body)
+        elif content_type == 'application/json':
+            try:
+                ocr_result = json.loads(body.decode('utf-8'))
+            except ValueError:
+                self._send_json(400, {'error': 'Invalid OCR JSON'})
+                return
+            if not isinstance(ocr_result, dict) or not isinstance(ocr_result.get('full_text'), str):
+                self._send_json(400, {'error': "OCR JSON must contain a 'full_text' string"})
+                return
+            job = Job(user_id, 'ocr', ocr_result)
+        else:
+            self._send_json(415, {'error': 'Content-Type must be image/png or application/json'})
+            return
+
+        service = self.server.service
+        if not service.submit(job):
+            self._send_json(503, {'error': 'Server busy, try again shortly'}, {'Retry-After': '1'})
+            return
+
+        if not job.done.wait(self.server.job_timeout):
+            # Don't analyze (and update todo.md) for a client that was told it failed
+            service.cancel(job)
+            self._send_json(504, {'error': 'Analysis timed out'})
+            return
+
+        if job.error:
+            self._send_json(500, {'error': job.error})
+            return
+
+        self._send_json(200, {'user': user_id, 'analysis': job.result})
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        print(f"   {self.address_string()} - {format % args}")
+
+
+class AnalysisHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server with a listen backlog sized for bursts of uploads"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS,
+               queue_size=DEFAULT_QUEUE_SIZE, data_dir=None, job_timeout=DEFAULT_JOB_TIMEOUT):
+    """
+    Start the SnapTask analysis server and block until interrupted
+
+    Args:
+        host: Interface to bind
+        port: TCP port to listen on
+        workers: Number of analysis worker threads
+        queue_size: Maximum number of queued requests before returning 503
+        data_dir: Root for per-user directories (defaults to ~/.snap)
+        job_timeout: Seconds a request waits for its analysis before 504
+    """
+    from common import load_env_config
+
+    load_env_config()
+
+    if data_dir is None:
+        data_dir = os.path.expanduser('~/.snap')
+
+    service = AnalysisService(data_dir, workers=workers, queue_size=queue_size)
+    service.start()
+
+    httpd = AnalysisHTTPServer((host, port), AnalysisRequestHandler)
+    httpd.service = service
+    httpd.job_timeout = job_timeout
+
+    print(f"🖥️  SnapTask server listening on http://{host}:{port}")
+    print(f"   {workers} workers, queue size {queue_size}, data in {os.path.join(data_dir, 'users')}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        httpd.server_close()
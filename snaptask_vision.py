@@ -13,20 +13,35 @@ def encode_image(image_path):
         return base64.b64encode(image_file.read()).decode('utf-8')
 
 
-def analyze_screenshot(image_path, api_key=None):
-    """Send screenshot to OpenAI for analysis with file management tools"""
-    # Lazy import - only load when needed
-    from openai import OpenAI
-    from common import load_prompt, run_agent_loop, get_system_message, DEFAULT_VISION_PROMPT
-
-    if api_key is None:
-        api_key = os.getenv('OPENAI_API_KEY')
-
-    if not api_key:
-        raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
+def analyze_screenshot(image_path, api_key=None, snap_dir=None, client=None, config=None):
+    """
+    Send screenshot to the configured vision model for analysis with file management tools
+
+    Args:
+        image_path: Path to the PNG screenshot
+        api_key: Optional API key (defaults to OPENAI_API_KEY)
+        snap_dir: Directory holding todo.md/focused.md (defaults to ~/.snap)
+        client: Optional shared OpenAI client (created from config if omitted)
+        config: Optional dict returned by get_llm_config()
+
+    Returns:
+        String containing the analysis output
+    """
+    from common import (
+        load_prompt,
+        run_analysis,
+        get_system_message,
+        get_llm_config,
+        create_llm_client,
+        DEFAULT_VISION_PROMPT
+    )
 
-    client = OpenAI(api_key=api_key)
-    snap_dir = os.path.expanduser('~/.snap')
+    if config is None:
+        config = get_llm_config()
+    if client is None:
+        client = create_llm_client(config, api_key)
+    if snap_dir is None:
+        snap_dir = os.path.expanduser('~/.snap')
 
     # Encode the image
     base64_image = encode_image(image_path)
@@ -57,8 +72,8 @@ def analyze_screenshot(image_path, api_key=None):
         }
     ]
 
-    # Run agent loop
-    return run_agent_loop(client, "gpt-4o", messages, snap_dir)
+    # Run agent loop (or plain prompt if the model can't call tools)
+    return run_analysis(client, config['vision_model'], messages, snap_dir, config)
 
 def create_default_prompts():
     """Create default prompt files if they don't exist"""
@@ -70,40 +85,72 @@ def create_default_prompts():
 
 def main():
     """Main execution flow"""
-    # Import only what's needed for initial setup and screenshot
+    # Only the stdlib capture path is imported before screencapture launches
+    from snaptask_capture import (
+        ENV_FILE,
+        env_file_exists,
+        env_file_has_placeholder_key,
+        generate_screenshot_path,
+        start_capture,
+        finish_capture
+    )
+
+    # First-run setup is interactive, so it has to finish before capture starts.
+    # An unedited placeholder key is caught here too, without loading dotenv.
+    if not env_file_exists() or env_file_has_placeholder_key():
+        from common import ensure_env_file_exists
+        if not ensure_env_file_exists():
+            return  # Setup needed, exit gracefully
+
+    # Generate screenshot path
+    screenshot_path = generate_screenshot_path()
+
+    # Launch screencapture right away, then do the slow setup while the user selects
+    print("🎨 Capturing screenshot...")
+    print("   → Drag to select area, or press SPACE to select window, ESC to cancel")
+    capture = start_capture(screenshot_path)
+
     from common import (
         ensure_env_file_exists,
         load_env_config,
-        generate_screenshot_path,
-        capture_screenshot,
+        get_server_url,
         save_analysis,
-        show_notification
+        show_notification,
+        warm_imports
     )
 
-    # Ensure .env file exists and is configured
-    if not ensure_env_file_exists():
-        return  # Setup needed, exit gracefully
-
     # Load environment from ~/.snap/.env
     load_env_config()
 
     # Create default prompt files if they don't exist
     create_default_prompts()
 
-    # Generate screenshot path
-    screenshot_path = generate_screenshot_path()
+    if not get_server_url():
+        warm_imports(['openai'])
 
-    # Capture screenshot - THIS HAPPENS FAST NOW!
-    print("🎨 Capturing screenshot...")
-    print("   → Drag to select area, or press SPACE to select window, ESC to cancel")
-    if not capture_screenshot(screenshot_path):
+    if not finish_capture(capture, screenshot_path):
         print("   Screenshot canceled or failed")
         return
 
-    # Analyze with OpenAI
-    print("\n🤖 Analyzing screenshot with OpenAI Vision...")
+    # Validate the config only now, so setup messages don't pop up mid-selection
+    if not ensure_env_file_exists():
+        os.remove(screenshot_path)
+        print(f"   Screenshot discarded: SnapTask setup is incomplete, edit {ENV_FILE} and capture again")
+        return
+
+    # Analyze with vision model, or let a SnapTask server do it
+    from common import get_llm_config, get_user_id, upload_for_analysis
+    server_url = get_server_url()
+    if server_url:
+        print(f"\n☁️  Sending screenshot to SnapTask server at {server_url}...")
+    else:
+        print(f"\n🤖 Analyzing screenshot with {get_llm_config()['vision_model']}...")
     try:
-        analysis = analyze_screenshot(screenshot_path)
+        if server_url:
+            with open(screenshot_path, 'rb') as f:
+                analysis = upload_for_analysis(server_url, get_user_id(), f.read(), 'image/png')
+        else:
+            analysis = analyze_screenshot(screenshot_path)
         print("\n" + "="*60)
         print("📊 ANALYSIS")
         print("="*60)
@@ -7,6 +7,8 @@ set -e
 
 BIN_DIR="/usr/local/bin"
 SNAPTASK_BIN="$BIN_DIR/snaptask"
+# Directory (onedir) builds are installed here and linked from $SNAPTASK_BIN
+SNAPTASK_LIB="/usr/local/lib/snaptask"
 
 echo "=========================================="
 echo "  SnapTask Uninstaller"
@@ -14,12 +16,20 @@ echo "=========================================="
 echo ""
 
 # Check what kind of installation exists
-if [ -f "$SNAPTASK_BIN" ]; then
+if [ -f "$SNAPTASK_BIN" ] || [ -L "$SNAPTASK_BIN" ]; then
     if [ -L "$SNAPTASK_BIN" ]; then
         echo "🗑️  Found symlink installation at $SNAPTASK_BIN"
+        LINK_TARGET=$(readlink "$SNAPTASK_BIN")
         echo "    Removing symlink..."
         sudo rm "$SNAPTASK_BIN"
         echo "✓ Symlink removed"
+
+        # Directory build: remove the bundle the symlink pointed into
+        if [[ "$LINK_TARGET" == "$SNAPTASK_LIB/"* ]] && [ -d "$SNAPTASK_LIB" ]; then
+            echo "    Removing directory build at $SNAPTASK_LIB..."
+            sudo rm -rf "$SNAPTASK_LIB"
+            echo "✓ Directory build removed"
+        fi
     else
         echo "🗑️  Found binary installation at $SNAPTASK_BIN"
         read -p "Remove binary? (y/n) " -n 1 -r